@@ -1,181 +1,289 @@
+import functools
 import json
+import hashlib
+import logging
 import random
-from datetime import datetime, timedelta
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+import time
+import orjson
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, Response
+
+from utils.orjson_response import ORJSONResponse
+from utils.ttl_cache import ttl_cache
+
+# Скан рынка дорогой, а данные меняются медленно
+SCAN_CACHE_TTL = 30
 
 # Создаём router ПЕРВЫМ делом!
 router = APIRouter()
 
-# Тестовые данные для демонстрации
+logger = logging.getLogger(__name__)
+
+def _compact(value, ndigits: int = 4):
+    """Округляет float и превращает целые float в int (короче на проводе)"""
+    if isinstance(value, float):
+        value = round(value, ndigits)
+        return int(value) if value.is_integer() else value
+    if isinstance(value, dict):
+        return {k: _compact(v, ndigits) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_compact(v, ndigits) for v in value]
+    return value
+
+# Тестовые данные для демонстрации.
+# Ответы не меняются, поэтому сериализуем их один раз при импорте.
+_BALANCE_BYTES = orjson.dumps(_compact({
+    "total_balance": 15427.50,
+    "available_balance": 8421.75,
+    "pnl_total": 3247.50,
+    "pnl_today": 142.30,
+    "win_rate": 67.8,
+    "sharpe_ratio": 1.24,
+    "max_drawdown": -8.45
+}))
+
+_POSITIONS_BYTES = orjson.dumps(_compact([
+    {
+        "symbol": "BTCUSDT",
+        "size": 0.15,
+        "entry_price": 42500.0,
+        "current_price": 43820.5,
+        "unrealized_pnl": 198.08,
+        "pnl_percent": 3.1
+    },
+    {
+        "symbol": "ETHUSDT",
+        "size": 2.3,
+        "entry_price": 2540.0,
+        "current_price": 2621.8,
+        "unrealized_pnl": 188.14,
+        "pnl_percent": 3.2
+    }
+]))
+
+_MARKET_BYTES = orjson.dumps(_compact({
+    "BTCUSDT": {
+        "price": 43820.5,
+        "change_24h": 2.34,
+        "volume": 2850000000,
+        "high_24h": 44200.0,
+        "low_24h": 43250.0
+    },
+    "ETHUSDT": {
+        "price": 2621.8,
+        "change_24h": 1.87,
+        "volume": 1200000000,
+        "high_24h": 2650.0,
+        "low_24h": 2580.0
+    },
+    "ADAUSDT": {
+        "price": 0.512,
+        "change_24h": -0.45,
+        "volume": 350000000,
+        "high_24h": 0.525,
+        "low_24h": 0.508
+    }
+}))
+
+_TRADES_BYTES = orjson.dumps(_compact([
+    {
+        "symbol": "BTCUSDT",
+        "side": "BUY",
+        "size": 0.1,
+        "price": 42500.0,
+        "timestamp": "2024-01-15T10:30:00Z",
+        "pnl": 132.05
+    },
+    {
+        "symbol": "ETHUSDT",
+        "side": "SELL",
+        "size": 1.5,
+        "price": 2610.0,
+        "timestamp": "2024-01-15T09:15:00Z",
+        "pnl": 45.20
+    }
+]))
+
+# В health меняется только timestamp - подставляем его в готовый шаблон
+_HEALTH_TEMPLATE = orjson.dumps({
+    "status": "healthy",
+    "service": "ai_llm_gateway",
+    "timestamp": "%s",
+    "version": "1.0.0"
+}).decode()
+
+def _now_iso(t=None) -> str:
+    """ISO-время с точностью до секунды без создания объекта datetime"""
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(t))
+
+# Готовое тело health, пересобирается не чаще раза в секунду
+_health_ts = 0
+_health_body = b""
+
+
+def _health_bytes() -> bytes:
+    global _health_ts, _health_body
+    t = int(time.time())
+    if t != _health_ts:
+        _health_body = (_HEALTH_TEMPLATE % _now_iso(t)).encode()
+        _health_ts = t
+    return _health_body
+
+
+def _json_bytes(data: bytes, status_code: int = 200) -> Response:
+    """Отдаёт уже сериализованный JSON без повторного кодирования"""
+    return Response(content=data, status_code=status_code, media_type="application/json")
+
+
+def _etag(data: bytes) -> str:
+    return '"' + hashlib.blake2b(data, digest_size=8).hexdigest() + '"'
+
+_BALANCE_ETAG = _etag(_BALANCE_BYTES)
+_POSITIONS_ETAG = _etag(_POSITIONS_BYTES)
+_MARKET_ETAG = _etag(_MARKET_BYTES)
+_TRADES_ETAG = _etag(_TRADES_BYTES)
+
+
+def _static_json(request: Request, data: bytes, etag: str) -> Response:
+    """Неизменяемый JSON с ETag: 304 без тела, если у клиента он уже есть"""
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=data, media_type="application/json", headers={"ETag": etag})
+
+
 @router.get("/api/balance")
-async def get_balance():
+async def get_balance(request: Request):
     """Возвращает текущий баланс и PnL"""
-    return {
-        "total_balance": 15427.50,
-        "available_balance": 8421.75,
-        "pnl_total": 3247.50,
-        "pnl_today": 142.30,
-        "win_rate": 67.8,
-        "sharpe_ratio": 1.24,
-        "max_drawdown": -8.45
-    }
+    return _static_json(request, _BALANCE_BYTES, _BALANCE_ETAG)
 
 @router.get("/api/positions")
-async def get_positions():
+async def get_positions(request: Request):
     """Возвращает текущие позиции"""
-    return [
-        {
-            "symbol": "BTCUSDT",
-            "size": 0.15,
-            "entry_price": 42500.0,
-            "current_price": 43820.5,
-            "unrealized_pnl": 198.08,
-            "pnl_percent": 3.1
-        },
-        {
-            "symbol": "ETHUSDT",
-            "size": 2.3,
-            "entry_price": 2540.0,
-            "current_price": 2621.8,
-            "unrealized_pnl": 188.14,
-            "pnl_percent": 3.2
-        }
-    ]
+    return _static_json(request, _POSITIONS_BYTES, _POSITIONS_ETAG)
 
-@router.get("/api/market_data")
-async def get_market_data():
+@router.get("/api/market_data", response_model=None, response_class=ORJSONResponse)
+async def get_market_data(request: Request):
     """Возвращает рыночные данные"""
-    return {
-        "BTCUSDT": {
-            "price": 43820.5, 
-            "change_24h": 2.34,
-            "volume": 2850000000,
-            "high_24h": 44200.0,
-            "low_24h": 43250.0
-        },
-        "ETHUSDT": {
-            "price": 2621.8, 
-            "change_24h": 1.87,
-            "volume": 1200000000,
-            "high_24h": 2650.0,
-            "low_24h": 2580.0
-        },
-        "ADAUSDT": {
-            "price": 0.512, 
-            "change_24h": -0.45,
-            "volume": 350000000,
-            "high_24h": 0.525,
-            "low_24h": 0.508
-        }
-    }
+    return _static_json(request, _MARKET_BYTES, _MARKET_ETAG)
+
+# Сигналы радара храним списком, а модули изменений - отдельным массивом,
+# чтобы фильтр по порогу был одной векторной операцией.
+# numpy импортируем при первом запросе, а не при старте воркера
+_RADAR_SIGNALS = [
+    {"symbol": "BTCUSDT", "price": 43820.5, "change": 0.0234, "volume_change": 15.6},
+    {"symbol": "SOLUSDT", "price": 142.3, "change": 0.0156, "volume_change": 22.1},
+    {"symbol": "AVAXUSDT", "price": 34.56, "change": 0.0087, "volume_change": 18.3}
+]
+
+@functools.lru_cache(maxsize=1)
+def _radar_abs_changes():
+    import numpy as np
+    return np.abs(np.array([s["change"] for s in _RADAR_SIGNALS], dtype=np.float64))
 
 @router.get("/api/radar_signals")
 async def get_radar_signals(threshold: float = 0.005):
     """Возвращает сигналы радара"""
-    signals = [
-        {"symbol": "BTCUSDT", "price": 43820.5, "change": 0.0234, "volume_change": 15.6},
-        {"symbol": "SOLUSDT", "price": 142.3, "change": 0.0156, "volume_change": 22.1},
-        {"symbol": "AVAXUSDT", "price": 34.56, "change": 0.0087, "volume_change": 18.3}
-    ]
-    
     # Фильтруем по порогу
-    filtered_signals = [s for s in signals if abs(s["change"]) >= threshold]
-    return filtered_signals
+    idx = (_radar_abs_changes() >= threshold).nonzero()[0]
+    return [_RADAR_SIGNALS[i] for i in idx.tolist()]
 
 @router.get("/api/trades")
-async def get_trades(limit: int = 10):
+async def get_trades(request: Request, limit: int = 10):
     """Возвращает историю сделок"""
-    return [
-        {
-            "symbol": "BTCUSDT",
-            "side": "BUY",
-            "size": 0.1,
-            "price": 42500.0,
-            "timestamp": "2024-01-15T10:30:00Z",
-            "pnl": 132.05
-        },
-        {
-            "symbol": "ETHUSDT", 
-            "side": "SELL",
-            "size": 1.5,
-            "price": 2610.0,
-            "timestamp": "2024-01-15T09:15:00Z", 
-            "pnl": 45.20
-        }
-    ]
+    return _static_json(request, _TRADES_BYTES, _TRADES_ETAG)
 
 @router.get("/api/health")
 async def health_check():
     """Проверка статуса сервиса"""
-    return {
-        "status": "healthy",
-        "service": "ai_llm_gateway",
-        "timestamp": datetime.now().isoformat(),
-        "version": "1.0.0"
-    }
+    return _json_bytes(_health_bytes())
 
 # ============================================
 # AI RADAR ENDPOINTS - ДОБАВЛЯЕМ ПОСЛЕ ОСНОВНЫХ
 # ============================================
 
-# Импортируем AI Radar только когда он нужен, чтобы избежать циклических импортов
-try:
-    from services.ai_radar import ai_radar
-    
-    @router.get("/api/ai_radar/scan")
-    async def ai_radar_scan():
-        """Запускает полное сканирование рынка AI радаром"""
-        try:
-            results = await ai_radar.scan_market()
-            return results
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"AI Radar error: {str(e)}")
-
-    @router.get("/api/ai_radar/symbol/{symbol}")
-    async def ai_radar_symbol(symbol: str):
-        """Анализирует конкретный символ"""
-        try:
-            result = await ai_radar.analyze_symbol(symbol.upper())
-            return result
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"AI Radar error: {str(e)}")
-
-    @router.get("/api/ai_radar/signals")
-    async def ai_radar_signals():
-        """Возвращает только сигналы"""
+def _project_signal(data):
+    """Оставляет из анализа символа только поля, нужные для /signals"""
+    return {
+        "price": data.get("price"),
+        "recommendation": data.get("recommendation"),
+        "signals": data["signals"],
+        "trend": (data.get("indicators") or {}).get("trend", "neutral")
+    }
+
+# AI Radar тянет numpy, индикаторы и сетевой клиент - импортируем его лениво,
+# при первом обращении к /api/ai_radar/*, а не при старте воркера
+_ai_radar = None
+_ai_radar_err = None
+
+
+def _get_radar():
+    """Возвращает экземпляр AI Radar или None, если модуль недоступен"""
+    global _ai_radar, _ai_radar_err
+    if _ai_radar is None and _ai_radar_err is None:
         try:
-            results = await ai_radar.scan_market()
-            signals = {}
-            
-            for symbol, data in results["symbols"].items():
-                if "signals" in data:
-                    signals[symbol] = {
-                        "price": data.get("price"),
-                        "recommendation": data.get("recommendation"),
-                        "signals": data.get("signals", {}),
-                        "trend": data.get("indicators", {}).get("trend", "neutral")
-                    }
-            
-            return {
-                "timestamp": results["timestamp"],
-                "signals": signals
-            }
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"AI Radar error: {str(e)}")
-
-except ImportError as e:
-    print(f"⚠️ AI Radar module not available: {e}")
-    
-    # Заглушки для AI Radar endpoints если модуль не доступен
-    @router.get("/api/ai_radar/scan")
-    async def ai_radar_scan_stub():
-        return {"error": "AI Radar module not installed", "timestamp": datetime.now().isoformat()}
-    
-    @router.get("/api/ai_radar/symbol/{symbol}")
-    async def ai_radar_symbol_stub(symbol: str):
-        return {"error": "AI Radar module not installed", "symbol": symbol, "timestamp": datetime.now().isoformat()}
-    
-    @router.get("/api/ai_radar/signals")
-    async def ai_radar_signals_stub():
-        return {"error": "AI Radar module not installed", "timestamp": datetime.now().isoformat()}
\ No newline at end of file
+            from services.ai_radar import ai_radar
+            _ai_radar = ai_radar
+        except ImportError as e:
+            _ai_radar_err = e
+            logger.warning("⚠️ AI Radar module not available: %s", e)
+    return _ai_radar
+
+
+async def close_radar():
+    """Закрывает HTTP-сессию AI Radar, если модуль успел загрузиться"""
+    if _ai_radar is not None:
+        await _ai_radar.close()
+
+
+def _radar_unavailable(**extra):
+    """Ответ-заглушка, если модуль AI Radar не установлен"""
+    return {"error": "AI Radar module not installed", **extra, "timestamp": _now_iso()}
+
+
+@ttl_cache(SCAN_CACHE_TTL)
+async def _cached_scan():
+    """Общий скан рынка для /scan и /signals - один расчёт на окно кэша"""
+    return await _get_radar().scan_market()
+
+@router.get("/api/ai_radar/scan", response_model=None, response_class=ORJSONResponse)
+async def ai_radar_scan():
+    """Запускает полное сканирование рынка AI радаром"""
+    if _get_radar() is None:
+        return _radar_unavailable()
+    try:
+        results = await _cached_scan()
+        return ORJSONResponse(results)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"AI Radar error: {str(e)}")
+
+@router.get("/api/ai_radar/symbol/{symbol}", response_model=None, response_class=ORJSONResponse)
+async def ai_radar_symbol(symbol: str):
+    """Анализирует конкретный символ"""
+    radar = _get_radar()
+    if radar is None:
+        return _radar_unavailable(symbol=symbol)
+    try:
+        result = await radar.analyze_symbol(symbol.upper())
+        return ORJSONResponse(result)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"AI Radar error: {str(e)}")
+
+@router.get("/api/ai_radar/signals", response_model=None, response_class=ORJSONResponse)
+async def ai_radar_signals():
+    """Возвращает только сигналы"""
+    if _get_radar() is None:
+        return _radar_unavailable()
+    try:
+        results = await _cached_scan()
+        signals = {
+            symbol: _project_signal(data)
+            for symbol, data in results["symbols"].items()
+            if data.get("signals") is not None
+        }
+
+        return ORJSONResponse({
+            "timestamp": results["timestamp"],
+            "signals": signals
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"AI Radar error: {str(e)}")
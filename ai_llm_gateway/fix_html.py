@@ -1,34 +1,68 @@
 import os
+import re
 import glob
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
 
-def fix_html_files():
+# Исправления путей к статическим файлам.
+# Работаем с сырыми байтами, чтобы не гонять файл через decode/encode.
+REPLACEMENTS: Dict[bytes, bytes] = {
+    b'href="static/': b'href="/static/',
+    b'src="static/': b'src="/static/',
+    b'href="css/': b'href="/static/css/',
+    b'src="js/': b'src="/static/js/',
+}
+
+# Все шаблоны одним проходом вместо отдельного replace на каждый
+_REPLACE_RE = re.compile(b"|".join(map(re.escape, REPLACEMENTS)))
+
+logger = logging.getLogger(__name__)
+
+HEAD_INSERT: bytes = b'    <link rel="stylesheet" href="/static/css/style.css">\n    <script src="/static/js/app.js"></script>'
+
+def _fix_one(file_path: str) -> bool:
+    """Исправляет один шаблон, возвращает True если файл был перезаписан"""
+    with open(file_path, 'rb') as f:
+        original = f.read()
+    
+    # Исправляем пути к статическим файлам
+    content: bytes = _REPLACE_RE.sub(lambda m: REPLACEMENTS[m.group(0)], original)
+    
+    # Добавляем базовую структуру если её нет
+    if b'</head>' in content and b'style.css' not in content:
+        content = content.replace(b'</head>', HEAD_INSERT + b'\n</head>')
+    
+    # Пишем только изменённые файлы, через временный файл для атомарности
+    if content == original:
+        return False
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, file_path)
+    return True
+
+def fix_html_files() -> None:
     templates_dir = "templates"
     
     # Находим все HTML файлы
-    html_files = glob.glob(os.path.join(templates_dir, "*.html"))
+    html_files: List[str] = glob.glob(os.path.join(templates_dir, "*.html"))
+    if not html_files:
+        return
+    
+    # Файлы независимы - перекрываем чтение/запись в пуле потоков
+    with ThreadPoolExecutor(max_workers=min(32, len(html_files))) as ex:
+        results: List[Tuple[str, bool]] = list(zip(html_files, ex.map(_fix_one, html_files)))
     
-    for file_path in html_files:
-        print(f"Исправляю {file_path}...")
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Исправляем пути к статическим файлам
-        content = content.replace('href="static/', 'href="/static/')
-        content = content.replace('src="static/', 'src="/static/')
-        content = content.replace('href="css/', 'href="/static/css/')
-        content = content.replace('src="js/', 'src="/static/js/')
-        
-        # Добавляем базовую структуру если её нет
-        if '</head>' in content and 'style.css' not in content:
-            head_insert = '    <link rel="stylesheet" href="/static/css/style.css">\n    <script src="/static/js/app.js"></script>'
-            content = content.replace('</head>', head_insert + '\n</head>')
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
-        print(f"✅ {file_path} исправлен")
+    # Один вывод в конце вместо пары print на каждый файл
+    fixed = [path for path, changed in results if changed]
+    skipped = [path for path, changed in results if not changed]
+    if fixed:
+        logger.info("✅ Исправлено (%d):\n%s", len(fixed), "\n".join(fixed))
+    if skipped:
+        logger.info("⏭️ Без изменений (%d):\n%s", len(skipped), "\n".join(skipped))
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     fix_html_files()
-    print("🎉 Все HTML файлы исправлены!")
\ No newline at end of file
+    logger.info("🎉 Все HTML файлы исправлены!")
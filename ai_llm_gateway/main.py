@@ -1,23 +1,90 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import HTMLResponse, Response
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.middleware.cors import CORSMiddleware
 import os
+import gzip
+import hashlib
+import httpx
+import orjson
 from dotenv import load_dotenv
 
-from api_data import router as data_router
+from api_data import router as data_router, close_radar
+from routers.proxy import router as proxy_router
+from routers.trading import router as trading_router
+from utils.log import start_queue_logging
+from utils.middleware import HealthInterceptor
+from utils.orjson_response import ORJSONResponse
+from utils.static_files import CachedStaticFiles
 
 # Загружаем переменные окружения
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log_listener = start_queue_logging(os.getenv("LOG_LEVEL", "info"))
+    # Один httpx-клиент на всё приложение: пул keep-alive соединений
+    # к сервисам бота вместо нового TCP-соединения на каждый запрос
+    # http2: через TLS-прокси запросы мультиплексируются в одном соединении,
+    # к простым http:// сервисам httpx сам остаётся на HTTP/1.1
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(20.0, connect=5.0),
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=30.0),
+    )
+    # Страницы кодируем и сжимаем заранее, а не на первом запросе
+    for filename in PAGE_FILES:
+        _load_page(filename)
+    yield
+    await app.state.http.aclose()
+    # Сессия Binance в AI Radar тоже общая на все запросы,
+    # поэтому закрываем её только при остановке приложения
+    await close_radar()
+    log_listener.stop()
+
 app = FastAPI(
     title="AI LLM Gateway",
     description="Шлюз для AI торгового бота",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
+
+# Сжимаем ответы от 1 КБ (скан AI Radar, HTML, статика); мелкие JSON не трогаем
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# CORS только для известных фронтендов; preflight кэшируется браузером на сутки.
+# Шлюз сам себе CORS не нужен - по умолчанию разрешён ai_metrics_ui, поднятый
+# через `python -m http.server` (порт 8000); другие источники - через env
+DEFAULT_FRONTEND_ORIGINS = "http://127.0.0.1:8000,http://localhost:8000"
+FRONTEND_ORIGINS = [
+    o.strip()
+    for o in os.getenv("FRONTEND_ORIGINS", DEFAULT_FRONTEND_ORIGINS).split(",")
+    if o.strip()
+]
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=FRONTEND_ORIGINS,
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "authorization"],
+    allow_credentials=False,
+    max_age=86400,
+)
+
+# /api/status отвечает до стека FastAPI: тело статично, роутинг и middleware не нужны
+# (добавлен последним, поэтому внешний - раньше GZip и остальных)
+app.add_middleware(
+    HealthInterceptor,
+    path="/api/status",
+    body=orjson.dumps({"status": "ok", "service": "ai_llm_gateway"}),
 )
 
 # Подключаем статические файлы
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", CachedStaticFiles(directory="static", max_age=int(os.getenv("STATIC_MAX_AGE", "3600"))), name="static")
 app.include_router(data_router)
+app.include_router(proxy_router)
+app.include_router(trading_router)
 
 # Функция для чтения HTML файлов из папки templates
 def read_html_file(filename):
@@ -42,61 +109,112 @@ def read_html_file(filename):
         </html>
         """
 
+# Страницы держим в памяти: UTF-8 байты, gzip-копия и ETag считаются один раз
+# и пересобираются, только когда у файла сменился mtime
+_PAGES = {}
+PAGE_FILES = (
+    "dashboard_ops.html", "radar.html", "trades.html", "positions.html", "backtest.html",
+    "training.html", "settings.html", "help.html", "test.html",
+)
+
+def _load_page(filename):
+    try:
+        mtime = os.stat(f"templates/{filename}").st_mtime_ns
+    except FileNotFoundError:
+        mtime = None
+    page = _PAGES.get(filename)
+    if page is None or page[0] != mtime:
+        raw = read_html_file(filename).encode("utf-8")
+        digest = hashlib.blake2b(raw, digest_size=8).hexdigest()
+        # У сжатого и несжатого вариантов разные байты, значит и разные ETag
+        page = (mtime, raw, gzip.compress(raw, 9), f'"{digest}"', f'"{digest}-gz"')
+        _PAGES[filename] = page
+    return page
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Принимает ли клиент gzip с учётом q-значений (gzip;q=0 - отказ)"""
+    quality = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        quality[coding] = q
+    # Явный gzip важнее «*»
+    return quality.get("gzip", quality.get("*", 0.0)) > 0
+
+def html_page(request: Request, filename: str) -> Response:
+    """Отдаёт страницу из кэша: 304 по ETag, gzip если клиент его принимает"""
+    _, raw, gz, etag, gz_etag = _load_page(filename)
+    use_gzip = _accepts_gzip(request.headers.get("accept-encoding", ""))
+    if use_gzip:
+        etag = gz_etag
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=300", "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(gz, media_type="text/html; charset=utf-8", headers=headers)
+    return Response(raw, media_type="text/html; charset=utf-8", headers=headers)
+
 @app.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
-    content = read_html_file("dashboard_ops.html")
-    return HTMLResponse(content=content)
+    return html_page(request, "dashboard_ops.html")
 
 @app.get("/dashboard_ops", response_class=HTMLResponse)
 async def dashboard_ops(request: Request):
-    content = read_html_file("dashboard_ops.html")
-    return HTMLResponse(content=content)
+    return html_page(request, "dashboard_ops.html")
 
 @app.get("/radar", response_class=HTMLResponse)
 async def radar(request: Request):
-    content = read_html_file("radar.html")
-    return HTMLResponse(content=content)
+    return html_page(request, "radar.html")
 
 @app.get("/trades", response_class=HTMLResponse)
 async def trades(request: Request):
-    content = read_html_file("trades.html")
-    return HTMLResponse(content=content)
+    return html_page(request, "trades.html")
 
 @app.get("/positions", response_class=HTMLResponse)
 async def positions(request: Request):
-    content = read_html_file("positions.html")
-    return HTMLResponse(content=content)
+    return html_page(request, "positions.html")
 
 @app.get("/backtest", response_class=HTMLResponse)
 async def backtest(request: Request):
-    content = read_html_file("backtest.html")
-    return HTMLResponse(content=content)
+    return html_page(request, "backtest.html")
 
 @app.get("/training", response_class=HTMLResponse)
 async def training(request: Request):
-    content = read_html_file("training.html")
-    return HTMLResponse(content=content)
+    return html_page(request, "training.html")
 
 @app.get("/settings", response_class=HTMLResponse)
 async def settings(request: Request):
-    content = read_html_file("settings.html")
-    return HTMLResponse(content=content)
+    return html_page(request, "settings.html")
 
 @app.get("/help", response_class=HTMLResponse)
 async def help_page(request: Request):
-    content = read_html_file("help.html")
-    return HTMLResponse(content=content)
+    return html_page(request, "help.html")
 
 @app.get("/test", response_class=HTMLResponse)
 async def test_page(request: Request):
-    content = read_html_file("test.html")
-    return HTMLResponse(content=content)
-
-@app.get("/api/status")
-async def api_status():
-    return {"status": "ok", "service": "ai_llm_gateway"}
+    return html_page(request, "test.html")
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT_GATEWAY", 8800))
-    uvicorn.run(app, host="0.0.0.0", port=port)
\ No newline at end of file
+    # loop="auto" берёт uvloop там, где он есть (на Windows его нет), парсер - httptools.
+    # Несколько воркеров требуют строку импорта вместо объекта приложения
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        loop="auto",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", 1)),
+    )
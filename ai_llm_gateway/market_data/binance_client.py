@@ -16,12 +16,20 @@ class BinanceClient:
 
     async def get_session(self):
         if self.session is None:
-            self.session = aiohttp.ClientSession()
+            # Один пул соединений на клиента: параллельные запросы скана
+            # переиспользуют TCP+TLS к api.binance.com, DNS кэшируется
+            connector = aiohttp.TCPConnector(
+                limit=100, limit_per_host=20, ttl_dns_cache=300, keepalive_timeout=60
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=10)
+            )
         return self.session
 
     async def close(self):
         if self.session:
             await self.session.close()
+            self.session = None
 
     async def get_exchange_info(self):
         """Получает информацию о торговых парах"""
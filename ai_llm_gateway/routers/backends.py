@@ -0,0 +1,15 @@
+# Адреса сервисов бота - единый список для прокси и /api/trading/*
+EXECUTOR_BASE   = "http://127.0.0.1:8600"
+BACKTESTER_BASE = "http://127.0.0.1:8900"
+INGESTOR_BASE   = "http://127.0.0.1:8700"
+AI_BASE         = "http://127.0.0.1:8750"
+ALERTS_BASE     = "http://127.0.0.1:8650"
+
+# Сервисы, доступные через /proxy/{service}/...
+BACKENDS = {
+    "executor":   EXECUTOR_BASE,
+    "backtester": BACKTESTER_BASE,
+    "ingestor":   INGESTOR_BASE,
+    "ai":         AI_BASE,
+    "alerts":     ALERTS_BASE,
+}
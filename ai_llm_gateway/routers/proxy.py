@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.background import BackgroundTask
+import httpx
+
+from routers.backends import BACKENDS
+
+router = APIRouter(tags=["proxy"])
+
+
+# Hop-by-hop заголовки относятся к конкретному соединению и не пересылаются
+HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "transfer-encoding", "upgrade",
+}
+
+# host выставит httpx для сервиса, content-length пересчитает по телу.
+# accept-encoding подменяем на identity: сжимает ответ только GZipMiddleware
+# шлюза, иначе уже сжатое тело сервиса может быть сжато повторно.
+# Hop-by-hop тоже не пересылаем: тело уже собрано целиком, и transfer-encoding
+# рядом с content-length от httpx сервис отвергает как некорректный запрос
+SKIP_REQUEST_HEADERS = {b"host", b"content-length", b"accept-encoding"} | {
+    h.encode("latin-1") for h in HOP_HEADERS
+}
+UPSTREAM_ENCODING = (b"accept-encoding", b"identity")
+
+# date и server uvicorn шлюза выставляет сам - копии от сервиса дали бы дубли
+SKIP_RESPONSE_HEADERS = HOP_HEADERS | {"date", "server"}
+
+async def _proxy(request: Request, base: str, path: str):
+    """Проксирует запрос в сервис и стримит ответ клиенту как есть.
+
+    Тело ответа не буферизуется и не разбирается: байты уходят клиенту
+    по мере поступления от сервиса, сжатие делает GZipMiddleware.
+    """
+    client = request.app.state.http
+    # Заголовки и query берём из ASGI scope как есть, без копий в dict
+    headers = [(k, v) for k, v in request.headers.raw if k not in SKIP_REQUEST_HEADERS]
+    headers.append(UPSTREAM_ENCODING)
+    url = f"{base}/{path}"
+    query = request.scope.get("query_string")
+    if query:
+        url = f"{url}?{query.decode('latin-1')}"
+    body = await request.body() if request.method != "GET" else None
+    req = client.build_request(request.method, url, headers=headers, content=body)
+    try:
+        r = await client.send(req, stream=True)
+    except httpx.HTTPError as e:
+        return JSONResponse({"ok": False, "error": f"upstream error: {e}"}, status_code=502)
+    response = StreamingResponse(
+        r.aiter_raw(),
+        status_code=r.status_code,
+        background=BackgroundTask(r.aclose),
+    )
+    # multi_items сохраняет повторяющиеся заголовки (set-cookie и т.п.),
+    # которые потерялись бы при сборке dict
+    response.raw_headers = [
+        (k.lower().encode("latin-1"), v.encode("latin-1"))
+        for k, v in r.headers.multi_items()
+        if k.lower() not in SKIP_RESPONSE_HEADERS
+    ]
+    return response
+
+# GET и POST регистрируем отдельными маршрутами: у api_route с двумя методами
+# обе операции получают один operation_id и OpenAPI ругается на дубликат
+@router.get("/proxy/{service}/{path:path}", operation_id="proxy_get")
+@router.post("/proxy/{service}/{path:path}", operation_id="proxy_post")
+async def proxy(service: str, path: str, request: Request):
+    base = BACKENDS.get(service)
+    if base is None:
+        return JSONResponse({"ok": False, "error": f"unknown service: {service}"}, status_code=404)
+    return await _proxy(request, base, path)
@@ -1,115 +1,200 @@
 
-from fastapi import APIRouter, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Query, Request, Response
+import asyncio
 import httpx
+import orjson
 
-from ..schemas import (
+from schemas import (
     RiskSettings, RiskResponse, PositionsResponse, TradesResponse,
     MetricsResponse, TickerLast
 )
+from routers.backends import AI_BASE, BACKTESTER_BASE, EXECUTOR_BASE, INGESTOR_BASE
+from utils.orjson_response import ORJSONResponse
+from utils.ttl_cache import ttl_cache
 
 router = APIRouter(tags=["trading"])
 
-EXECUTOR_BASE   = "http://127.0.0.1:8600"
-BACKTESTER_BASE = "http://127.0.0.1:8900"
-INGESTOR_BASE   = "http://127.0.0.1:8700"
-AI_BASE         = "http://127.0.0.1:8750"
+# HTTP-клиент общий для всех запросов: request.app.state.http (lifespan приложения)
 
-timeout = httpx.Timeout(20.0, connect=5.0)
+# Статус и метрики опрашивает каждая открытая вкладка дашборда - короткий кэш
+# схлопывает одновременные запросы в один поход к сервисам
+STATUS_CACHE_TTL = 2.0
+METRICS_CACHE_TTL = 1.0
+POSITIONS_CACHE_TTL = 0.5
+
+# Таймаут проб сервисов (status, дашборд) и адреса health-эндпоинтов
+# собираем один раз при импорте
+STATUS_TIMEOUT = httpx.Timeout(5.0)
+HEALTH_URLS = [
+    ("executor",   f"{EXECUTOR_BASE}/health"),
+    ("backtester", f"{BACKTESTER_BASE}/health"),
+    ("ingestor",   f"{INGESTOR_BASE}/health"),
+    ("ai",         f"{AI_BASE}/health"),
+]
+
+def _upstream_error(e):
+    """Сервис недоступен - 502 с текстом ошибки, как в /proxy, а не голый 500"""
+    return ORJSONResponse({"ok": False, "error": f"upstream error: {e}"}, status_code=502)
+
+@ttl_cache(POSITIONS_CACHE_TTL)
+async def _fetch_positions(client):
+    return await client.get(f"{EXECUTOR_BASE}/positions")
 
 @router.get("/api/trading/positions", response_model=PositionsResponse)
-async def api_positions():
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        r = await client.get(f"{EXECUTOR_BASE}/positions")
+async def api_positions(request: Request):
+    try:
+        r = await _fetch_positions(request.app.state.http)
+    except httpx.HTTPError as e:
+        return _upstream_error(e)
+    if r.status_code == 200:
+        return orjson.loads(r.content)
+    return {"ok": False, "positions": []}
+
+async def _trades(client, limit, source):
+    """Сделки исполнителя (с откатом на позиции) или бэктестера"""
+    if source == "executor":
+        r = await client.get(f"{EXECUTOR_BASE}/trades", params={"limit": limit})
+        if r.status_code == 200:
+            try:
+                return orjson.loads(r.content)
+            except Exception:
+                pass
+        r_pos = await client.get(f"{EXECUTOR_BASE}/positions")
+        if r_pos.status_code == 200:
+            js = orjson.loads(r_pos.content) or {}
+            pos = js.get("positions") or []
+            trades = [{
+                "ts": p.get("ts"),
+                "kind": "paper",
+                "symbol": p.get("symbol"),
+                "side": p.get("side"),
+                "qty": p.get("qty"),
+                "extra": {
+                    "px@trade": p.get("price"),
+                    "px@now": None,
+                    "dpx": None
+                }
+            } for p in pos][-limit:]
+            return {"ok": True, "trades": trades}
+        return {"ok": True, "trades": []}
+    else:
+        r = await client.get(f"{BACKTESTER_BASE}/trades", params={"limit": limit})
         if r.status_code == 200:
-            return r.json()
-        return {"ok": False, "positions": []}
+            try:
+                return orjson.loads(r.content)
+            except Exception:
+                pass
+        return {"ok": True, "trades": []}
 
 @router.get("/api/trading/trades", response_model=TradesResponse)
 async def api_trades(
+    request: Request,
     limit: int = Query(50, ge=1, le=500),
     source: str = Query("executor", pattern="^(executor|backtester)$")
 ):
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        if source == "executor":
-            r = await client.get(f"{EXECUTOR_BASE}/trades", params={"limit": limit})
-            if r.status_code == 200:
-                try:
-                    return r.json()
-                except Exception:
-                    pass
-            r_pos = await client.get(f"{EXECUTOR_BASE}/positions")
-            if r_pos.status_code == 200:
-                js = r_pos.json() or {}
-                pos = js.get("positions") or []
-                trades = [{
-                    "ts": p.get("ts"),
-                    "kind": "paper",
-                    "symbol": p.get("symbol"),
-                    "side": p.get("side"),
-                    "qty": p.get("qty"),
-                    "extra": {
-                        "px@trade": p.get("price"),
-                        "px@now": None,
-                        "dpx": None
-                    }
-                } for p in pos][-limit:]
-                return {"ok": True, "trades": trades}
-            return {"ok": True, "trades": []}
-        else:
-            r = await client.get(f"{BACKTESTER_BASE}/trades", params={"limit": limit})
-            if r.status_code == 200:
-                try:
-                    return r.json()
-                except Exception:
-                    pass
-            return {"ok": True, "trades": []}
+    try:
+        return await _trades(request.app.state.http, limit, source)
+    except httpx.HTTPError as e:
+        return _upstream_error(e)
+
+def _passthrough(r, headers=None):
+    """Отдаёт тело сервиса как есть: без разбора JSON и повторной сериализации"""
+    return Response(r.content, status_code=r.status_code, headers=headers,
+                    media_type=r.headers.get("content-type", "application/json"))
 
 @router.get("/api/trading/risk", response_model=RiskResponse)
-async def api_risk_get():
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        r = await client.get(f"{EXECUTOR_BASE}/risk")
-        return JSONResponse(r.json(), status_code=r.status_code)
+async def api_risk_get(request: Request):
+    try:
+        r = await request.app.state.http.get(f"{EXECUTOR_BASE}/risk")
+    except httpx.HTTPError as e:
+        return _upstream_error(e)
+    return _passthrough(r)
 
 @router.post("/api/trading/risk", response_model=RiskResponse)
-async def api_risk_set(body: RiskSettings):
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        r = await client.post(f"{EXECUTOR_BASE}/risk", json=body.model_dump())
-        return JSONResponse(r.json(), status_code=r.status_code)
+async def api_risk_set(request: Request, body: RiskSettings):
+    # Pydantic сериализует модель сразу в JSON-байты, без dict и stdlib json в httpx
+    try:
+        r = await request.app.state.http.post(
+            f"{EXECUTOR_BASE}/risk",
+            content=body.model_dump_json(),
+            headers={"content-type": "application/json"},
+        )
+    except httpx.HTTPError as e:
+        return _upstream_error(e)
+    return _passthrough(r)
 
 @router.post("/api/trading/risk/unblock", response_model=RiskResponse)
-async def api_risk_unblock():
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        r = await client.post(f"{EXECUTOR_BASE}/risk/unblock")
-        return JSONResponse(r.json(), status_code=r.status_code)
+async def api_risk_unblock(request: Request):
+    try:
+        r = await request.app.state.http.post(f"{EXECUTOR_BASE}/risk/unblock")
+    except httpx.HTTPError as e:
+        return _upstream_error(e)
+    return _passthrough(r)
+
+@ttl_cache(METRICS_CACHE_TTL)
+async def _fetch_metrics(client):
+    return await client.get(f"{AI_BASE}/metrics")
 
 @router.get("/api/trading/metrics", response_model=MetricsResponse)
-async def api_metrics():
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        r = await client.get(f"{AI_BASE}/metrics")
-        return JSONResponse(r.json(), status_code=r.status_code)
+async def api_metrics(request: Request):
+    try:
+        r = await _fetch_metrics(request.app.state.http)
+    except httpx.HTTPError as e:
+        return _upstream_error(e)
+    return _passthrough(r, headers={"Cache-Control": f"max-age={METRICS_CACHE_TTL:g}"})
 
 @router.get("/api/trading/ticker", response_model=TickerLast)
-async def api_ticker(symbol: str = Query("BTCUSDT")):
-    async with httpx.AsyncClient(timeout=timeout) as client:
-        r = await client.get(f"{INGESTOR_BASE}/last", params={"symbol": symbol})
-        return JSONResponse(r.json(), status_code=r.status_code)
+async def api_ticker(request: Request, symbol: str = Query("BTCUSDT")):
+    try:
+        r = await request.app.state.http.get(f"{INGESTOR_BASE}/last", params={"symbol": symbol})
+    except httpx.HTTPError as e:
+        return _upstream_error(e)
+    return _passthrough(r)
+
+async def _probe(client, name, url):
+    try:
+        r = await client.get(url, timeout=STATUS_TIMEOUT)
+        return {"name": name, "ok": r.status_code == 200}
+    except Exception:
+        # любая ошибка пробы - этот сервис недоступен, а не 500 на весь статус
+        return {"name": name, "ok": False}
+
+@ttl_cache(STATUS_CACHE_TTL)
+async def _collect_status(client):
+    # Опрашиваем сервисы параллельно: время ответа = самый медленный, а не сумма
+    out = await asyncio.gather(*(_probe(client, name, url) for name, url in HEALTH_URLS))
+    return {"ok": True, "services": list(out)}
 
 @router.get("/api/trading/status")
-async def api_status():
-    out = []
-    async with httpx.AsyncClient(timeout=httpx.Timeout(5.0)) as client:
-        for name, url in [
-            ("executor",   f"{EXECUTOR_BASE}/health"),
-            ("backtester", f"{BACKTESTER_BASE}/health"),
-            ("ingestor",   f"{INGESTOR_BASE}/health"),
-            ("ai",         f"{AI_BASE}/health"),
-        ]:
-            ok = False
-            try:
-                r = await client.get(url)
-                ok = (r.status_code == 200)
-            except Exception:
-                ok = False
-            out.append({"name": name, "ok": ok})
-    return {"ok": True, "services": out}
+async def api_status(request: Request, response: Response):
+    response.headers["Cache-Control"] = f"max-age={STATUS_CACHE_TTL:g}"
+    return await _collect_status(request.app.state.http)
+
+# Дашборд опрашивает только то, что рисует (метрики AI); кэш схлопывает
+# опросы открытых вкладок в один поход к сервису
+DASHBOARD_CACHE_TTL = 2.0
+DASHBOARD_SOURCES = [
+    ("ai", f"{AI_BASE}/metrics"),
+]
+
+def _safe_json(r):
+    if not isinstance(r, httpx.Response) or r.status_code != 200:
+        return None
+    try:
+        return orjson.loads(r.content)
+    except orjson.JSONDecodeError:
+        return None
+
+@ttl_cache(DASHBOARD_CACHE_TTL)
+async def _collect_dashboard(client):
+    results = await asyncio.gather(
+        *(client.get(url, timeout=STATUS_TIMEOUT) for _, url in DASHBOARD_SOURCES),
+        return_exceptions=True,
+    )
+    return {name: _safe_json(r) for (name, _), r in zip(DASHBOARD_SOURCES, results)}
+
+@router.get("/api/trading/dashboard")
+async def dashboard(request: Request):
+    """Данные KPI дашборда одним ответом"""
+    return ORJSONResponse(await _collect_dashboard(request.app.state.http),
+                          headers={"Cache-Control": f"public, max-age={DASHBOARD_CACHE_TTL:g}"})
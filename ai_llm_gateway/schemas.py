@@ -1,5 +1,5 @@
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, RootModel
 from typing import List, Optional, Literal, Dict, Any
 
 class RiskSettings(BaseModel):
@@ -46,5 +46,5 @@ class TickerLast(BaseModel):
     ok: bool
     last: Optional[Dict[str, Any]] = None
 
-class MetricsResponse(BaseModel):
-    __root__: Dict[str, Any]
+class MetricsResponse(RootModel[Dict[str, Any]]):
+    pass
@@ -1,53 +1,70 @@
 import asyncio
 import json
+import logging
 from datetime import datetime
 from typing import Dict, List
+import numpy as np
 from market_data.binance_client import BinanceClient
 from technical_analysis.indicators import TechnicalIndicators
 
+logger = logging.getLogger(__name__)
+
+ANALYSIS_CACHE_MAX = 256
+
+
+def _closes_from_klines(klines) -> np.ndarray:
+    """Цены закрытия свечей сразу в float64-массив, без промежуточных float-объектов"""
+    return np.array([k[4] for k in klines], dtype=np.float64)
+
 class AIRadar:
     def __init__(self):
         self.binance = BinanceClient()
         self.indicators = TechnicalIndicators()
         self.symbols = ["BTCUSDT", "ETHUSDT", "ADAUSDT", "SOLUSDT", "DOTUSDT"]
         self.analysis_results = {}
+        # symbol -> ((время открытия, закрытие последней свечи), результат анализа)
+        self._cache: Dict[str, tuple] = {}
 
     async def analyze_symbol(self, symbol: str) -> Dict:
         """Анализирует один символ"""
         try:
             # Получаем данные
             klines = await self.binance.get_klines(symbol, "1h", 100)
-            prices = [float(k[4]) for k in klines]  # Цены закрытия
+            
+            # Закрытые свечи не меняются, последняя ещё формируется: если её время
+            # открытия и цена закрытия те же, индикаторы совпадут с прошлым расчётом
+            bar_key = (klines[-1][0], klines[-1][4]) if klines else None
+            cached = self._cache.get(symbol)
+            if cached is not None and cached[0] == bar_key:
+                return {**cached[1], "timestamp": datetime.now().isoformat()}
+            
+            prices = _closes_from_klines(klines)  # Цены закрытия
             
             if len(prices) < 26:  # Минимум для индикаторов
-                return {"error": "Недостаточно данных"}
+                return {"symbol": symbol, "error": "Недостаточно данных"}
             
-            current_price = prices[-1]
+            current_price = float(prices[-1])
             
-            # Вычисляем индикаторы
-            rsi = self.indicators.calculate_rsi(prices)
-            macd = self.indicators.calculate_macd(prices)
-            bollinger = self.indicators.calculate_bollinger_bands(prices)
-            support_resistance = self.indicators.calculate_support_resistance(prices)
-            trend = self.indicators.detect_trend(prices)
+            # Вычисляем все индикаторы одним проходом
+            indicators = self.indicators.compute_all(prices)
             
             # Генерируем сигналы
-            signals = self._generate_signals(rsi, macd, bollinger, current_price)
+            signals = self._generate_signals(
+                indicators["rsi"], indicators["macd"], indicators["bollinger_bands"], current_price
+            )
             
-            return {
+            result = {
                 "symbol": symbol,
                 "price": current_price,
                 "timestamp": datetime.now().isoformat(),
-                "indicators": {
-                    "rsi": rsi,
-                    "macd": macd,
-                    "bollinger_bands": bollinger,
-                    "support_resistance": support_resistance,
-                    "trend": trend
-                },
+                "indicators": indicators,
                 "signals": signals,
                 "recommendation": self._get_recommendation(signals)
             }
+            if symbol not in self._cache and len(self._cache) >= ANALYSIS_CACHE_MAX:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[symbol] = (bar_key, result)
+            return result
             
         except Exception as e:
             return {"symbol": symbol, "error": str(e)}
@@ -103,9 +120,15 @@ class AIRadar:
             "symbols": {}
         }
         
-        for result in results:
-            if isinstance(result, dict) and "symbol" in result:
-                self.analysis_results["symbols"][result["symbol"]] = result
+        for symbol, result in zip(self.symbols, results):
+            # analyze_symbol сам ловит Exception - сюда долетает только отмена
+            if isinstance(result, BaseException):
+                logger.warning("AI Radar: анализ %s прерван: %r", symbol, result)
+                continue
+            # Ошибочные символы остаются в ответе с полем error, но попадают в лог
+            if "error" in result:
+                logger.warning("AI Radar: ошибка анализа %s: %s", symbol, result["error"])
+            self.analysis_results["symbols"][symbol] = result
         
         return self.analysis_results
 
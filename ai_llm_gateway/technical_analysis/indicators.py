@@ -1,7 +1,125 @@
 import numpy as np
-import pandas as pd
 from typing import List, Tuple, Dict
 
+from utils._njit import njit
+
+
+@njit(cache=True)
+def _macd_last(vals, a_fast, a_slow, a_sig):
+    """Последние MACD, сигнальная линия и гистограмма за один проход.
+
+    Та же рекурсия, что у pandas ewm(adjust=False): s_t = s_{t-1} + a*(x_t - s_{t-1}),
+    начальные значения - первая цена (для сигнальной линии - MACD[0] = 0).
+    """
+    ef = vals[0]
+    es = vals[0]
+    m = 0.0
+    sig = 0.0
+    for i in range(1, vals.shape[0]):
+        v = vals[i]
+        ef += a_fast * (v - ef)
+        es += a_slow * (v - es)
+        m = ef - es
+        sig += a_sig * (m - sig)
+    return m, sig, m - sig
+
+
+@njit(cache=True)
+def _rsi_last(vals, period):
+    """Средний рост и падение по последним period приращениям - без временных массивов"""
+    n = vals.shape[0]
+    start = max(1, n - period)
+    gain = 0.0
+    loss = 0.0
+    for i in range(start, n):
+        d = vals[i] - vals[i - 1]
+        if d > 0:
+            gain += d
+        else:
+            loss -= d
+    count = n - start
+    return gain / count, loss / count
+
+
+@njit(cache=True)
+def _all_indicators(v, rsi_p, a_fast, a_slow, a_sig, bb, sr, short_w, long_w):
+    """RSI, MACD, Bollinger, поддержка/сопротивление и обе MA за один проход.
+
+    Каждая величина считается на своём хвостовом окне, как в отдельных методах;
+    среднее и дисперсия Bollinger - по Уэлфорду, как в _bb_last.
+    """
+    n = v.shape[0]
+    rsi_start = max(1, n - rsi_p)
+    bb_start = max(0, n - bb)
+    sr_start = max(0, n - sr)
+    short_start = max(0, n - short_w)
+    long_start = max(0, n - long_w)
+    ef = v[0]
+    es = v[0]
+    m = 0.0
+    sig = 0.0
+    gain = 0.0
+    loss = 0.0
+    bb_k = 0
+    bb_mean = 0.0
+    bb_m2 = 0.0
+    lo = np.inf
+    hi = -np.inf
+    short_sum = 0.0
+    long_sum = 0.0
+    for i in range(n):
+        x = v[i]
+        if i > 0:
+            ef += a_fast * (x - ef)
+            es += a_slow * (x - es)
+            m = ef - es
+            sig += a_sig * (m - sig)
+            if i >= rsi_start:
+                d = x - v[i - 1]
+                if d > 0:
+                    gain += d
+                else:
+                    loss -= d
+        if i >= bb_start:
+            bb_k += 1
+            d = x - bb_mean
+            bb_mean += d / bb_k
+            bb_m2 += d * (x - bb_mean)
+        if i >= sr_start:
+            if x < lo:
+                lo = x
+            if x > hi:
+                hi = x
+        if i >= short_start:
+            short_sum += x
+        if i >= long_start:
+            long_sum += x
+    nr = max(n - rsi_start, 1)
+    var = bb_m2 / (bb_k - 1) if bb_k > 1 else 0.0
+    return (
+        gain / nr, loss / nr,
+        m, sig, m - sig,
+        bb_mean, np.sqrt(var),
+        lo, hi,
+        short_sum / (n - short_start), long_sum / (n - long_start),
+    )
+
+
+@njit(cache=True)
+def _bb_last(v, period):
+    """Среднее и выборочное std последних period цен за один проход (алгоритм Уэлфорда)"""
+    n = v.shape[0]
+    mean = 0.0
+    m2 = 0.0
+    k = 0
+    for i in range(n - period, n):
+        k += 1
+        d = v[i] - mean
+        mean += d / k
+        m2 += d * (v[i] - mean)
+    return mean, np.sqrt(m2 / (period - 1)) if period > 1 else 0.0
+
+
 class TechnicalIndicators:
     @staticmethod
     def calculate_rsi(prices: List[float], period: int = 14) -> float:
@@ -9,19 +127,15 @@ class TechnicalIndicators:
         if len(prices) < period:
             return 50.0
         
-        deltas = np.diff(prices)
-        gains = np.where(deltas > 0, deltas, 0)
-        losses = np.where(deltas < 0, -deltas, 0)
-        
-        avg_gain = np.mean(gains[-period:])
-        avg_loss = np.mean(losses[-period:])
+        arr = np.ascontiguousarray(prices, dtype=np.float64)
+        avg_gain, avg_loss = _rsi_last(arr, period)
         
         if avg_loss == 0:
             return 100.0
         
         rs = avg_gain / avg_loss
         rsi = 100 - (100 / (1 + rs))
-        return round(rsi, 2)
+        return round(float(rsi), 2)
 
     @staticmethod
     def calculate_macd(prices: List[float], fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> Dict:
@@ -29,17 +143,15 @@ class TechnicalIndicators:
         if len(prices) < slow_period:
             return {"macd": 0, "signal": 0, "histogram": 0}
         
-        exp1 = pd.Series(prices).ewm(span=fast_period, adjust=False).mean()
-        exp2 = pd.Series(prices).ewm(span=slow_period, adjust=False).mean()
-        
-        macd = exp1 - exp2
-        signal = macd.ewm(span=signal_period, adjust=False).mean()
-        histogram = macd - signal
+        vals = np.asarray(prices, dtype=np.float64)
+        macd, signal, histogram = _macd_last(
+            vals, 2.0 / (fast_period + 1), 2.0 / (slow_period + 1), 2.0 / (signal_period + 1)
+        )
         
         return {
-            "macd": round(macd.iloc[-1], 4),
-            "signal": round(signal.iloc[-1], 4),
-            "histogram": round(histogram.iloc[-1], 4)
+            "macd": round(float(macd), 4),
+            "signal": round(float(signal), 4),
+            "histogram": round(float(histogram), 4)
         }
 
     @staticmethod
@@ -48,19 +160,17 @@ class TechnicalIndicators:
         if len(prices) < period:
             return {"upper": 0, "middle": 0, "lower": 0, "width": 0}
         
-        series = pd.Series(prices[-period:])
-        middle = series.mean()
-        std = series.std()
+        middle, std = _bb_last(np.ascontiguousarray(prices, dtype=np.float64), period)
         
         upper = middle + (std * num_std)
         lower = middle - (std * num_std)
         width = (upper - lower) / middle  # Относительная ширина
         
         return {
-            "upper": round(upper, 2),
-            "middle": round(middle, 2),
-            "lower": round(lower, 2),
-            "width": round(width, 4)
+            "upper": round(float(upper), 2),
+            "middle": round(float(middle), 2),
+            "lower": round(float(lower), 2),
+            "width": round(float(width), 4)
         }
 
     @staticmethod
@@ -69,13 +179,13 @@ class TechnicalIndicators:
         if len(prices) < window:
             return {"support": 0, "resistance": 0}
         
-        recent_prices = prices[-window:]
-        support = min(recent_prices)
-        resistance = max(recent_prices)
+        recent_prices = np.asarray(prices[-window:], dtype=np.float64)
+        support = recent_prices.min()
+        resistance = recent_prices.max()
         
         return {
-            "support": round(support, 2),
-            "resistance": round(resistance, 2)
+            "support": round(float(support), 2),
+            "resistance": round(float(resistance), 2)
         }
 
     @staticmethod
@@ -92,4 +202,81 @@ class TechnicalIndicators:
         elif short_ma < long_ma * 0.98:  # 2% ниже
             return "bearish"
         else:
-            return "neutral"
\ No newline at end of file
+            return "neutral"
+
+    @staticmethod
+    def compute_all(prices, rsi_period: int = 14, fast_period: int = 12, slow_period: int = 26,
+                    signal_period: int = 9, bb_period: int = 20, num_std: int = 2,
+                    sr_window: int = 20, short_window: int = 10, long_window: int = 30) -> Dict:
+        """Вычисляет все индикаторы одним ядром по массиву цен.
+
+        Результат совпадает с отдельными методами, включая значения по умолчанию
+        при нехватке данных.
+        """
+        v = np.ascontiguousarray(prices, dtype=np.float64)
+        n = v.shape[0]
+        if n < 2:
+            return {
+                "rsi": TechnicalIndicators.calculate_rsi(prices, rsi_period),
+                "macd": TechnicalIndicators.calculate_macd(prices, fast_period, slow_period, signal_period),
+                "bollinger_bands": TechnicalIndicators.calculate_bollinger_bands(prices, bb_period, num_std),
+                "support_resistance": TechnicalIndicators.calculate_support_resistance(prices, sr_window),
+                "trend": TechnicalIndicators.detect_trend(prices, short_window, long_window),
+            }
+
+        (avg_gain, avg_loss, macd, signal, hist, middle, std,
+         support, resistance, short_ma, long_ma) = _all_indicators(
+            v, rsi_period,
+            2.0 / (fast_period + 1), 2.0 / (slow_period + 1), 2.0 / (signal_period + 1),
+            bb_period, sr_window, short_window, long_window,
+        )
+
+        if n < rsi_period:
+            rsi = 50.0
+        elif avg_loss == 0:
+            rsi = 100.0
+        else:
+            rsi = round(float(100 - 100 / (1 + avg_gain / avg_loss)), 2)
+
+        if n < slow_period:
+            macd_out = {"macd": 0, "signal": 0, "histogram": 0}
+        else:
+            macd_out = {
+                "macd": round(float(macd), 4),
+                "signal": round(float(signal), 4),
+                "histogram": round(float(hist), 4),
+            }
+
+        if n < bb_period:
+            bollinger = {"upper": 0, "middle": 0, "lower": 0, "width": 0}
+        else:
+            upper = middle + std * num_std
+            lower = middle - std * num_std
+            bollinger = {
+                "upper": round(float(upper), 2),
+                "middle": round(float(middle), 2),
+                "lower": round(float(lower), 2),
+                "width": round(float((upper - lower) / middle), 4),
+            }
+
+        if n < sr_window:
+            sr = {"support": 0, "resistance": 0}
+        else:
+            sr = {"support": round(float(support), 2), "resistance": round(float(resistance), 2)}
+
+        if n < long_window:
+            trend = "neutral"
+        elif short_ma > long_ma * 1.02:
+            trend = "bullish"
+        elif short_ma < long_ma * 0.98:
+            trend = "bearish"
+        else:
+            trend = "neutral"
+
+        return {
+            "rsi": rsi,
+            "macd": macd_out,
+            "bollinger_bands": bollinger,
+            "support_resistance": sr,
+            "trend": trend,
+        }
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Модули шлюза импортируются как верхнеуровневые (from routers..., from schemas ...),
+# как при запуске `uvicorn main:app` из каталога ai_llm_gateway
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,13 @@
+import logging
+
+from utils.log import start_queue_logging
+
+
+def test_stop_restores_root_logger():
+    root = logging.getLogger()
+    before = (root.handlers[:], root.level)
+    for _ in range(2):
+        listener = start_queue_logging("trace")
+        assert root.level == logging.INFO
+        listener.stop()
+        assert (root.handlers, root.level) == before
@@ -0,0 +1,53 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers.proxy import router
+
+seen = {}
+
+
+class EchoTransport(httpx.AsyncBaseTransport):
+    # MockTransport читает тело ответа заранее, а прокси стримит его через aiter_raw
+    async def handle_async_request(self, request):
+        seen["headers"] = request.headers
+        return httpx.Response(
+            200,
+            headers=[("date", "upstream"), ("server", "upstream"),
+                     ("set-cookie", "a=1"), ("set-cookie", "b=2")],
+            stream=httpx.ByteStream(await request.aread()),
+        )
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(router)
+    app.state.http = httpx.AsyncClient(transport=EchoTransport())
+    with TestClient(app) as c:
+        yield c
+
+
+def test_request_hop_headers_not_forwarded(client):
+    r = client.post("/proxy/ai/echo", content=b"x",
+                    headers={"connection": "close", "te": "trailers", "upgrade": "h2c"})
+    assert r.status_code == 200
+    sent = seen["headers"]
+    for name in ("te", "upgrade", "transfer-encoding"):
+        assert name not in sent
+    # connection: keep-alive выставляет сам клиент шлюза, а не браузер
+    assert sent.get("connection") != "close"
+    assert sent["accept-encoding"] == "identity"
+
+
+def test_response_headers(client):
+    r = client.get("/proxy/ai/echo")
+    assert "date" not in r.headers
+    assert "server" not in r.headers
+    assert r.headers.get_list("set-cookie") == ["a=1", "b=2"]
+
+
+def test_openapi_operation_ids_unique(client):
+    ops = client.get("/openapi.json").json()["paths"]["/proxy/{service}/{path}"]
+    assert {op["operationId"] for op in ops.values()} == {"proxy_get", "proxy_post"}
@@ -0,0 +1,46 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers.trading import router
+
+
+def _refuse(request):
+    raise httpx.ConnectError("connection refused", request=request)
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(router)
+    app.state.http = httpx.AsyncClient(transport=httpx.MockTransport(_refuse))
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.mark.parametrize("method, url, body", [
+    ("GET", "/api/trading/positions", None),
+    ("GET", "/api/trading/trades", None),
+    ("GET", "/api/trading/trades?source=backtester", None),
+    ("GET", "/api/trading/risk", None),
+    ("POST", "/api/trading/risk", {"max_orders_per_min": 10, "daily_loss_limit": 100.0,
+                                    "max_position_qty": 1.0, "max_notional": 1000.0}),
+    ("POST", "/api/trading/risk/unblock", None),
+    ("GET", "/api/trading/metrics", None),
+    ("GET", "/api/trading/ticker", None),
+])
+def test_upstream_down_returns_502(client, method, url, body):
+    r = client.request(method, url, json=body)
+    assert r.status_code == 502
+    js = r.json()
+    assert js["ok"] is False
+    assert js["error"].startswith("upstream error")
+
+
+def test_status_and_dashboard_degrade(client):
+    r = client.get("/api/trading/status")
+    assert r.status_code == 200
+    assert all(not s["ok"] for s in r.json()["services"])
+    r = client.get("/api/trading/dashboard")
+    assert r.status_code == 200
@@ -0,0 +1,8 @@
+try:
+    from numba import njit
+except ImportError:
+    # numba необязателен: без него ядра выполняются как обычные Python-функции
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -0,0 +1,49 @@
+import logging
+import logging.handlers
+import queue
+
+NOISY_LOGGERS = ("httpx", "httpcore")
+
+
+class _RootQueueListener(logging.handlers.QueueListener):
+    """QueueListener, который при остановке возвращает корневой логгер как был.
+
+    Иначе после остановки записи копятся в очереди, которую никто не читает,
+    а повторный запуск lifespan (тесты, reload) добавляет второй QueueHandler.
+    """
+
+    def __init__(self, q, handler):
+        super().__init__(q, handler, respect_handler_level=True)
+        root = logging.getLogger()
+        self._saved = (root.handlers[:], root.level)
+
+    def stop(self):
+        super().stop()
+        handlers, level = self._saved
+        root = logging.getLogger()
+        root.handlers[:] = handlers
+        root.setLevel(level)
+
+
+def start_queue_logging(level: str = "info") -> logging.handlers.QueueListener:
+    """Переводит корневой логгер на очередь.
+
+    Обработчики запросов только кладут запись в очередь, а запись в
+    stderr делает фоновый поток QueueListener - I/O логов не блокирует
+    event loop.
+    """
+    q = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = _RootQueueListener(q, handler)
+
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(q))
+    # LOG_LEVEL общий с uvicorn: его уровни вроде trace logging не знает
+    resolved = logging.getLevelName(level.upper())
+    root.setLevel(resolved if isinstance(resolved, int) else logging.INFO)
+    # httpx/httpcore пишут INFO на каждый запрос к сервисам - оставляем только предупреждения
+    for name in NOISY_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+    listener.start()
+    return listener
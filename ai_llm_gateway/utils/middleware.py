@@ -0,0 +1,34 @@
+class HealthInterceptor:
+    """Чистый ASGI-перехватчик для проверки живости сервиса.
+
+    Отвечает на запрос к path заранее сериализованным телом, не проходя
+    через роутинг FastAPI и остальные middleware - пробы мониторинга
+    и k8s стоят практически ноль.
+    """
+
+    def __init__(self, app, path: str, body: bytes):
+        self.app = app
+        self.path = path
+        self.body = body
+        self.headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] not in ("GET", "HEAD"):
+            await send({
+                "type": "http.response.start",
+                "status": 405,
+                "headers": [(b"allow", b"GET, HEAD"), (b"content-length", b"0")],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        await send({"type": "http.response.start", "status": 200, "headers": self.headers})
+        body = b"" if scope["method"] == "HEAD" else self.body
+        await send({"type": "http.response.body", "body": body})
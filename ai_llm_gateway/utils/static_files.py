@@ -0,0 +1,19 @@
+from starlette.staticfiles import StaticFiles
+
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles с заголовком Cache-Control для CSS/JS.
+
+    Имена файлов не содержат хэша, поэтому вместо immutable даём умеренный
+    max-age: повторные загрузки идут из кэша браузера, а после истечения
+    срока - условным запросом по ETag/Last-Modified с ответом 304.
+    """
+
+    def __init__(self, *args, max_age: int = 3600, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = f"public, max-age={max_age}"
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers.setdefault("cache-control", self.cache_control)
+        return response
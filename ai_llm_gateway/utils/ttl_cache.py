@@ -0,0 +1,42 @@
+import asyncio
+import functools
+import time
+
+
+def ttl_cache(seconds: float, maxsize: int = 256):
+    """Кэширует результат корутины на seconds секунд.
+
+    Одновременные вызовы с одинаковыми аргументами ждут одну и ту же задачу,
+    поэтому дорогой вызов выполняется не чаще одного раза за окно.
+    Исключения не кэшируются.
+    """
+    def decorator(func):
+        entries = {}
+
+        def _evict(now):
+            for key in [k for k, (ts, _) in entries.items() if now - ts >= seconds]:
+                del entries[key]
+            while len(entries) >= maxsize:
+                del entries[next(iter(entries))]
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            entry = entries.get(key)
+            if entry is None or now - entry[0] >= seconds:
+                if len(entries) >= maxsize:
+                    _evict(now)
+                entry = (now, asyncio.ensure_future(func(*args, **kwargs)))
+                entries[key] = entry
+            try:
+                # shield: отмена одного клиента не отменяет общий вызов
+                return await asyncio.shield(entry[1])
+            except Exception:
+                if entries.get(key) is entry:
+                    del entries[key]
+                raise
+
+        wrapper.cache_clear = entries.clear
+        return wrapper
+    return decorator
@@ -1,10 +1,20 @@
 # spark_panel/app.py
-from fastapi import FastAPI
-from fastapi.responses import HTMLResponse
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, Response
 import httpx
 
 INGESTOR_BASE = "http://127.0.0.1:8700"
-app = FastAPI(title="NewBot Spark Panel", version="0.1.1")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Один клиент на всё время работы: /last опрашивается раз в секунду
+    # из каждой вкладки, соединение с ingestor держим открытым
+    app.state.client = httpx.AsyncClient(base_url=INGESTOR_BASE, timeout=5.0)
+    yield
+    await app.state.client.aclose()
+
+app = FastAPI(title="NewBot Spark Panel", version="0.1.1", lifespan=lifespan)
 
 HTML = '''<!doctype html><html><head>
 <meta charset="utf-8"/><meta name="viewport" content="width=device-width,initial-scale=1">
@@ -31,20 +41,34 @@ body{margin:0;background:#0b0f14;color:#d9e1ea;font:14px system-ui}
 </div>
 <script>
 const $=(id)=>document.getElementById(id);
-const series=[]; const MAXN=600;
-function resetSeries(){ series.length=0; drawSpark(); }
+// ring buffer: fixed Float64Array, push is O(1) without shift()
+const MAXN=600; const series=new Float64Array(MAXN); let head=0, count=0;
+function pushPrice(px){ series[(head+count)%MAXN]=px; if(count<MAXN) count++; else head=(head+1)%MAXN; }
+function resetSeries(){ head=0; count=0; scheduleDraw(); }
+// redraws collapse into one paint per frame; hidden tabs do not paint at all
+let drawPending=false;
+function scheduleDraw(){
+  if(drawPending) return; drawPending=true;
+  requestAnimationFrame(()=>{ drawPending=false; if(document.visibilityState!=="hidden") drawSpark(); });
+}
 function drawSpark(){
   const c=$("spark"); const ctx=c.getContext("2d"); const w=c.width,h=c.height;
   ctx.clearRect(0,0,w,h);
   ctx.strokeStyle="#1d2633"; ctx.lineWidth=1;
   for(let x=0;x<w;x+=60){ ctx.beginPath(); ctx.moveTo(x,0); ctx.lineTo(x,h); ctx.stroke(); }
-  if(series.length<2){ ctx.fillStyle="#8aa0b5"; ctx.fillText("collecting...",10,20); return; }
-  const min=Math.min(...series), max=Math.max(...series); const pad=10, span=(max-min)||1;
+  if(count<2){ ctx.fillStyle="#8aa0b5"; ctx.fillText("collecting...",10,20); return; }
+  // min/max in one pass over the filled slots, no spread onto the call stack
+  let min=Infinity, max=-Infinity;
+  for(let i=0;i<count;i++){ const v=series[i]; if(v<min) min=v; if(v>max) max=v; }
+  const pad=10, span=(max-min)||1;
   ctx.beginPath(); ctx.strokeStyle="#9ecbff"; ctx.lineWidth=2;
-  for(let i=0;i<series.length;i++){
-    const x = pad + (w-2*pad) * i/(MAXN-1);
-    const y = pad + (h-2*pad) * (1 - (series[i]-min)/span);
-    if(i===0) ctx.moveTo(x,y); else ctx.lineTo(x,y);
+  // loop invariants hoisted: x/y are one multiply-add per point, ring index wraps without %
+  const sx=(w-2*pad)/(MAXN-1), sy=(h-2*pad)/span, y0=h-pad;
+  let j=head;
+  ctx.moveTo(pad, y0-(series[j]-min)*sy);
+  for(let i=1;i<count;i++){
+    if(++j===MAXN) j=0;
+    ctx.lineTo(pad+i*sx, y0-(series[j]-min)*sy);
   }
   ctx.stroke();
 }
@@ -55,18 +79,25 @@ async function poll(){
     const js = await r.json();
     const px = Number(js.last.price);
     $("lastBox").textContent = JSON.stringify(js,null,2);
-    if(!Number.isNaN(px)){ series.push(px); if(series.length>MAXN) series.shift(); drawSpark(); }
+    if(!Number.isNaN(px)){ pushPrice(px); scheduleDraw(); }
   }catch(e){}
 }
-setInterval(poll, 1000);
+let pollTimer=setInterval(poll, 1000);
+document.addEventListener("visibilitychange", ()=>{
+  if(document.visibilityState==="hidden"){ clearInterval(pollTimer); pollTimer=null; }
+  else if(pollTimer===null){ pollTimer=setInterval(poll, 1000); scheduleDraw(); }
+});
 </script></body></html>'''
 
+# Страница статична: кодируем один раз при импорте
+HTML_BYTES = HTML.encode("utf-8")
+
 @app.get("/", response_class=HTMLResponse)
 async def root():
-    return HTMLResponse(HTML)
+    return Response(HTML_BYTES, media_type="text/html; charset=utf-8",
+                    headers={"Cache-Control": "public, max-age=60"})
 
 @app.get("/last")
-async def last(symbol: str = "BTCUSDT"):
-    async with httpx.AsyncClient(timeout=5) as client:
-        r = await client.get(f"{INGESTOR_BASE}/last", params={"symbol": symbol})
+async def last(request: Request, symbol: str = "BTCUSDT"):
+    r = await request.app.state.client.get("/last", params={"symbol": symbol})
     return r.json()